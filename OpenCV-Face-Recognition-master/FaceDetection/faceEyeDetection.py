@@ -1,12 +1,18 @@
 import numpy as np
 import cv2
 import os
+import sys
+
+# Shared single-pass face/eye/smile detector lives at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+from face_attributes import FaceAttributeDetector
 
 # Load the pre-trained Haar Cascade classifiers for face and eye detection
-face_cascade_path = os.path.join(os.path.dirname(__file__), "Cascades", "haarcascade_frontalface_default.xml")
-eye_cascade_path = os.path.join(os.path.dirname(__file__), "Cascades", "haarcascade_eye.xml")
-faceCascade = cv2.CascadeClassifier(face_cascade_path)
-eyeCascade = cv2.CascadeClassifier(eye_cascade_path)
+detector = FaceAttributeDetector(
+    cascade_dir=os.path.join(os.path.dirname(__file__), "Cascades"),
+    detect_smile=False,
+    eye_params={'scaleFactor': 1.1, 'minNeighbors': 10, 'minSize': (10, 10)}  # Lower scaleFactor, more neighbors for precision
+)
 
 # Open a connection to the default camera (index 0)
 cap = cv2.VideoCapture(0)
@@ -23,31 +29,20 @@ while True:
     # Convert the frame to grayscale for face and eye detection
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     
-    # Detect faces in the grayscale frame
-    faces = faceCascade.detectMultiScale(
+    # Detect faces once; eyes are searched only in the upper half of each face
+    faces = detector.detect(
         gray,
         scaleFactor=1.1,      # Lower scaleFactor for more precision
         minNeighbors=7,       # Increased to reduce false positives
         minSize=(30, 30)
     )
 
-    # Draw rectangles around detected faces and look for eyes within each face
-    for (x, y, w, h) in faces:
+    # Draw rectangles around detected faces and eyes (boxes are in frame coordinates)
+    for (x, y, w, h), attributes in faces:
         cv2.rectangle(img, (x, y), (x + w, y + h), (255, 0, 0), 2)  # Blue box for face
-        roi_gray = gray[y:y + h, x:x + w]
-        roi_color = img[y:y + h, x:x + w]
-
-        # Detect eyes within the region of interest (the detected face)
-        eyes = eyeCascade.detectMultiScale(
-            roi_gray,
-            scaleFactor=1.1,    # Lower scaleFactor for eye detection precision
-            minNeighbors=10,    # Increased for more accuracy
-            minSize=(10, 10)
-        )
-        
-        # Draw rectangles around detected eyes
-        for (ex, ey, ew, eh) in eyes:
-            cv2.rectangle(roi_color, (ex, ey), (ex + ew, ey + eh), (0, 0, 255), 2)  # Red box for eyes
+
+        for (ex, ey, ew, eh) in attributes['eyes']:
+            cv2.rectangle(img, (ex, ey), (ex + ew, ey + eh), (0, 0, 255), 2)  # Red box for eyes
                
     # Display the frame with rectangles drawn around faces and eyes
     cv2.imshow('video', img)
@@ -60,4 +55,3 @@ while True:
 # Release the camera and close all OpenCV windows
 cap.release()
 cv2.destroyAllWindows()
-
@@ -1,11 +1,17 @@
 import cv2
 import os
+import sys
+
+# Shared single-pass face/eye/smile detector lives at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+from face_attributes import FaceAttributeDetector
 
 # Load the Haar Cascade classifiers for face and smile detection
-face_cascade_path = os.path.join(os.path.dirname(__file__), "Cascades", "haarcascade_frontalface_default.xml")
-smile_cascade_path = os.path.join(os.path.dirname(__file__), "Cascades", "haarcascade_smile.xml")
-faceCascade = cv2.CascadeClassifier(face_cascade_path)
-smileCascade = cv2.CascadeClassifier(smile_cascade_path)
+detector = FaceAttributeDetector(
+    cascade_dir=os.path.join(os.path.dirname(__file__), "Cascades"),
+    detect_eyes=False,
+    smile_params={'scaleFactor': 1.8, 'minNeighbors': 20, 'minSize': (25, 25)}  # Increase minNeighbors for fewer false positives
+)
 
 # Open a connection to the default camera (index 0)
 cap = cv2.VideoCapture(0)
@@ -19,31 +25,20 @@ while True:
     # Convert the frame to grayscale for face and smile detection
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     
-    # Detect faces in the grayscale frame
-    faces = faceCascade.detectMultiScale(
+    # Detect faces once; smiles are searched only in the lower third of each face
+    faces = detector.detect(
         gray,
         scaleFactor=1.1,
         minNeighbors=7,
         minSize=(30, 30)
     )
 
-    # Draw rectangles around detected faces and detect smiles within each face
-    for (x, y, w, h) in faces:
+    # Draw rectangles around detected faces and smiles (boxes are in frame coordinates)
+    for (x, y, w, h), attributes in faces:
         cv2.rectangle(img, (x, y), (x + w, y + h), (255, 0, 0), 2)  # Blue box for face
-        roi_gray = gray[y:y + h, x:x + w]
-        roi_color = img[y:y + h, x:x + w]
-
-        # Detect smiles within the region of interest (the detected face)
-        smiles = smileCascade.detectMultiScale(
-            roi_gray,
-            scaleFactor=1.8,  # Adjust scaleFactor for smile detection precision
-            minNeighbors=20,  # Increase for fewer false positives
-            minSize=(25, 25)
-        )
-
-        # Draw rectangles around detected smiles
-        for (sx, sy, sw, sh) in smiles:
-            cv2.rectangle(roi_color, (sx, sy), (sx + sw, sy + sh), (0, 255, 0), 2)  # Green box for smile
+
+        for (sx, sy, sw, sh) in attributes['smile']:
+            cv2.rectangle(img, (sx, sy), (sx + sw, sy + sh), (0, 255, 0), 2)  # Green box for smile
 
     # Display the frame with rectangles drawn around faces and smiles
     cv2.imshow('Face and Smile Detection', img)
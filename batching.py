@@ -0,0 +1,48 @@
+"""
+SafeSight Micro-Batching
+Merge concurrent per-camera calls into a single batched call
+"""
+
+import threading
+
+
+class MicroBatcher:
+    """
+    Collect items submitted concurrently (e.g. one per camera thread) and hand them to
+    run_batch(items) -> results together. The first caller waits up to max_wait seconds
+    for others to join, runs the batch, and every caller gets back its own result.
+    """
+
+    def __init__(self, run_batch, max_batch=4, max_wait=0.01):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._pending = []
+
+    def submit(self, item):
+        request = {'item': item, 'result': None, 'done': False}
+        with self._cond:
+            self._pending.append(request)
+            self._cond.notify_all()
+            # The first caller waits briefly for others to join, then runs the whole batch
+            if len(self._pending) < self.max_batch and self._pending[0] is request:
+                self._cond.wait_for(lambda: len(self._pending) >= self.max_batch, self.max_wait)
+            # Wait until our batch has run, or we are first in line to run the next one
+            while not request['done'] and not (self._pending and self._pending[0] is request):
+                self._cond.wait()
+            if request['done']:
+                return request['result']
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+
+        results = None
+        try:
+            results = self.run_batch([r['item'] for r in batch])
+        finally:
+            # On failure the other callers in this batch get None rather than hanging
+            with self._cond:
+                for index, r in enumerate(batch):
+                    r['result'] = results[index] if results is not None else None
+                    r['done'] = True
+                self._cond.notify_all()
+        return request['result']
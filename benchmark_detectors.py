@@ -0,0 +1,166 @@
+"""
+SafeSight Detector Benchmark
+Compare the Haar cascade and DNN face detectors on the same replayed footage
+
+Usage: python benchmark_detectors.py VIDEO [VIDEO ...] [--frames N] [--batch N] [--threads N] [--annotations FILE]
+
+Every backend sees the same frames. "agree" is the share of frames where a backend's boxes
+match the Haar boxes one-to-one (IoU >= 0.5). With --annotations, a JSON file of
+{"video file name": {"frame index": [[x, y, w, h], ...]}}, recall and precision are
+reported against those ground-truth boxes.
+"""
+
+import argparse
+import cv2
+import json
+import os
+import time
+from face_attributes import box_iou
+from face_detectors import HaarFaceDetector, DnnFaceDetector
+
+cascade_path = os.path.join(os.path.dirname(__file__), "OpenCV-Face-Recognition-master", "FacialRecognition", "haarcascade_frontalface_default.xml")
+
+# Boxes overlapping at least this much count as the same face
+MATCH_IOU = 0.5
+
+
+def load_frames(paths, limit):
+    """Decode up to `limit` frames from each video into memory so every backend sees identical input"""
+    clips = []
+    for path in paths:
+        capture = cv2.VideoCapture(path)
+        frames = []
+        while len(frames) < limit:
+            success, frame = capture.read()
+            if not success:
+                break
+            frames.append(frame)
+        capture.release()
+        if not frames:
+            raise SystemExit(f"[ERROR] Could not read frames from {path}")
+        print(f"[INFO] Loaded {len(frames)} frames from {path}")
+        clips.append(frames)
+    return clips
+
+
+def run(detector, streams, gray_streams, batched):
+    """
+    Detect faces in every frame of every stream; return (seconds, results) where
+    results[stream][index] is the box list for that frame. When `batched`, the frames
+    of all streams at one time step go through a single detect_batch call.
+    """
+    length = len(streams[0])
+
+    # Warm up once so lazy initialization is not timed
+    detector.detect_batch([streams[0][0]], [gray_streams[0][0]])
+
+    results = [[None] * length for _ in streams]
+    started = time.perf_counter()
+    for index in range(length):
+        if batched:
+            boxes = detector.detect_batch([s[index] for s in streams], [g[index] for g in gray_streams])
+            for stream, frame_boxes in enumerate(boxes):
+                results[stream][index] = frame_boxes
+        else:
+            for stream in range(len(streams)):
+                results[stream][index] = detector.detect(streams[stream][index], gray_streams[stream][index])
+    return time.perf_counter() - started, results
+
+
+def count_matches(found, expected):
+    """Greedily pair boxes at MATCH_IOU or better and return the number of pairs"""
+    unmatched = list(expected)
+    matches = 0
+    for box in found:
+        best = max(unmatched, key=lambda other: box_iou(box, other), default=None)
+        if best is not None and box_iou(box, best) >= MATCH_IOU:
+            unmatched.remove(best)
+            matches += 1
+    return matches
+
+
+def agreement(results, reference):
+    """Share of frames whose boxes pair one-to-one with the reference backend's"""
+    agreed = total = 0
+    for stream_results, stream_reference in zip(results, reference):
+        for found, expected in zip(stream_results, stream_reference):
+            total += 1
+            if len(found) == len(expected) == count_matches(found, expected):
+                agreed += 1
+    return agreed / total if total else 0.0
+
+
+def recall_precision(results, stream_names, annotations):
+    """Recall and precision against annotated frames only; None when nothing is annotated"""
+    matched = expected_total = found_total = 0
+    for stream_results, name in zip(results, stream_names):
+        labels = annotations.get(name, {})
+        for index, found in enumerate(stream_results):
+            if str(index) not in labels:
+                continue
+            expected = [tuple(box) for box in labels[str(index)]]
+            matched += count_matches(found, expected)
+            expected_total += len(expected)
+            found_total += len(found)
+    if not expected_total:
+        return None, None
+    return matched / expected_total, (matched / found_total if found_total else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Haar and DNN face detectors on recorded video")
+    parser.add_argument('videos', nargs='+', help="video files replayed as cameras")
+    parser.add_argument('--frames', type=int, default=300, help="frames to read per video")
+    parser.add_argument('--batch', type=int, default=1, help="cameras replayed at once (DNN batch size)")
+    parser.add_argument('--threads', type=int, default=4, help="OpenCV thread count")
+    parser.add_argument('--annotations', help="JSON ground-truth face boxes for recall/precision")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(args.threads)
+    clips = load_frames(args.videos, args.frames)
+    annotations = {}
+    if args.annotations:
+        with open(args.annotations, 'r') as f:
+            annotations = json.load(f)
+
+    # Replay the clips round-robin as `batch` cameras; every backend gets exactly these frames
+    length = min(len(frames) for frames in clips)
+    grays = [[cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames[:length]] for frames in clips]
+    streams = [clips[i % len(clips)][:length] for i in range(args.batch)]
+    gray_streams = [grays[i % len(clips)] for i in range(args.batch)]
+    stream_names = [os.path.basename(args.videos[i % len(clips)]) for i in range(args.batch)]
+
+    backends = [('haar', HaarFaceDetector(cascade_path), False)]
+    try:
+        dnn = DnnFaceDetector(threads=args.threads)
+    except FileNotFoundError as e:
+        print(f"[WARNING] Skipping DNN backend: {e}")
+    else:
+        backends.append(('dnn', dnn, False))
+        if args.batch > 1:
+            backends.append((f'dnn x{args.batch}', dnn, True))
+
+    rows = []
+    reference = None
+    for label, detector, batched in backends:
+        seconds, results = run(detector, streams, gray_streams, batched)
+        if reference is None:
+            reference = results
+        frames = sum(len(r) for r in results)
+        faces = sum(len(boxes) for r in results for boxes in r)
+        recall, precision = recall_precision(results, stream_names, annotations)
+        rows.append((label, frames, faces, 1000 * seconds / frames, frames / seconds,
+                     agreement(results, reference), recall, precision))
+
+    print("\n" + "="*84)
+    print(f"{'backend':<12}{'frames':>8}{'faces':>8}{'ms/frame':>12}{'fps':>10}{'agree':>10}{'recall':>12}{'precision':>12}")
+    print("="*84)
+    for label, frames, faces, ms, fps, agree, recall, precision in rows:
+        recall_text = f"{recall:.1%}" if recall is not None else "-"
+        precision_text = f"{precision:.1%}" if precision is not None else "-"
+        print(f"{label:<12}{frames:>8}{faces:>8}{ms:>12.2f}{fps:>10.1f}{agree:>10.1%}{recall_text:>12}{precision_text:>12}")
+    print("="*84)
+
+
+if __name__ == '__main__':
+    main()
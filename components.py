@@ -0,0 +1,141 @@
+"""
+SafeSight Server Components
+Background-initialized resources (model, cascade, cameras) with readiness reporting
+"""
+
+import cv2
+import threading
+import time
+
+# Component states reported by /api/status
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+ERROR = 'error'
+RECONNECTING = 'reconnecting'
+
+
+class LazyComponent:
+    """Load a resource once in a background thread and expose its readiness"""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.state = PENDING
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Begin loading in a daemon thread (no-op if already started)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _load(self):
+        self.state = LOADING
+        started = time.time()
+        try:
+            self.value = self.loader()
+        except Exception as e:
+            self.error = str(e)
+            self.state = ERROR
+            print(f"[ERROR] {self.name} failed to load: {e}")
+        else:
+            self.state = READY
+            print(f"[INFO] {self.name} ready in {time.time() - started:.2f}s")
+        finally:
+            self._ready.set()
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def wait(self, timeout=None):
+        """Block until loading finishes and return the value (None if it failed)"""
+        self._ready.wait(timeout)
+        return self.value
+
+    def describe(self):
+        return {'status': self.state, 'error': self.error}
+
+
+class CameraSource:
+    """Capture frames from one camera in a background thread, re-opening it after a disconnect"""
+
+    def __init__(self, index, api=cv2.CAP_DSHOW, width=640, height=480, retry_delay=2.0):
+        self.index = index
+        self.api = api
+        self.width = width
+        self.height = height
+        self.retry_delay = retry_delay
+        self.state = PENDING
+        self.error = None
+        self._frame = None
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        """Begin capturing in a daemon thread (no-op if already started)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"camera-{self.index}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+
+    def _run(self):
+        # Only the first attempt reports LOADING; retries keep ERROR/RECONNECTING visible
+        self.state = LOADING
+        while not self._stopped:
+            capture = cv2.VideoCapture(self.index, self.api)
+            if not capture.isOpened():
+                capture.release()
+                # A camera that was working stays RECONNECTING until it comes back
+                if self.state != RECONNECTING:
+                    self.error = 'Could not open camera'
+                    self.state = ERROR
+                print(f"[ERROR] Could not open camera {self.index}, retrying in {self.retry_delay}s")
+                time.sleep(self.retry_delay)
+                continue
+
+            capture.set(3, self.width)  # Set width
+            capture.set(4, self.height)  # Set height
+            self.error = None
+            self.state = READY
+            print(f"[INFO] Camera {self.index} initialized successfully")
+
+            while not self._stopped:
+                success, frame = capture.read()
+                if not success:
+                    break
+                with self._cond:
+                    self._frame = frame
+                    self._seq += 1
+                    self._cond.notify_all()
+
+            capture.release()
+            if not self._stopped:
+                self.error = 'Camera disconnected'
+                self.state = RECONNECTING
+                print(f"[WARNING] Camera {self.index} disconnected, re-acquiring")
+                time.sleep(self.retry_delay)
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def read(self, last_seq=0, timeout=1.0):
+        """Wait for a frame newer than last_seq; return (seq, frame) or (last_seq, None) on timeout"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != last_seq, timeout):
+                return last_seq, None
+            return self._seq, self._frame
+
+    def describe(self):
+        return {'index': self.index, 'status': self.state, 'error': self.error}
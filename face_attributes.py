@@ -0,0 +1,165 @@
+"""
+SafeSight Face Attribute Detector
+Single-pass face, eye and smile detection with per-face result caching
+"""
+
+import cv2
+import os
+import threading
+import time
+
+# Default location of the eye/smile cascades shipped with the detection samples
+CASCADE_DIR = os.path.join(os.path.dirname(__file__), "OpenCV-Face-Recognition-master", "FaceDetection", "Cascades")
+
+# A cached face is reused when the new box overlaps it by at least this much
+TRACK_IOU_THRESHOLD = 0.5
+
+# Seconds a cached attribute result stays valid for a tracked face
+ATTRIBUTE_CACHE_TTL = 1.0
+
+
+def box_iou(a, b):
+    """Intersection-over-union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def load_cascade(path):
+    """Load a Haar cascade, failing loudly instead of returning an empty classifier"""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Haar Cascade file not found at {path}")
+    cascade = cv2.CascadeClassifier()
+    try:
+        loaded = cascade.load(path)
+    except cv2.error:
+        loaded = False
+    if not loaded or cascade.empty():
+        raise FileNotFoundError(f"Haar Cascade file at {path} could not be loaded")
+    return cascade
+
+
+class FaceAttributeDetector:
+    """Detect faces once and run eye/smile cascades only on the relevant sub-regions"""
+
+    def __init__(self, face_cascade=None, cascade_dir=CASCADE_DIR,
+                 detect_eyes=True, detect_smile=True, cache_ttl=ATTRIBUTE_CACHE_TTL,
+                 eye_params=None, smile_params=None):
+        # The face cascade is only needed by detect(); callers with their own detector never load it
+        self.face_cascade = face_cascade
+        self.cascade_dir = cascade_dir
+        self.eye_cascade = None
+        self.smile_cascade = None
+        if detect_eyes:
+            self.eye_cascade = load_cascade(os.path.join(cascade_dir, "haarcascade_eye.xml"))
+        if detect_smile:
+            self.smile_cascade = load_cascade(os.path.join(cascade_dir, "haarcascade_smile.xml"))
+        self.cache_ttl = cache_ttl
+
+        # Optional detectMultiScale overrides (scaleFactor, minNeighbors, minSize, ...) per attribute
+        self.eye_params = eye_params or {}
+        self.smile_params = smile_params or {}
+
+        # Tracked faces per camera: camera -> [{'box', 'attributes', 'time'}, ...]
+        self._tracks = {}
+        self._lock = threading.Lock()
+
+    def detect(self, gray, scaleFactor=1.1, minNeighbors=8, minSize=(30, 30), camera=None):
+        """Detect faces in a grayscale frame and return [(box, attributes), ...]"""
+        if self.face_cascade is None:
+            self.face_cascade = load_cascade(os.path.join(self.cascade_dir, "haarcascade_frontalface_default.xml"))
+        faces = self.face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=scaleFactor,
+            minNeighbors=minNeighbors,
+            minSize=minSize
+        )
+        now = time.time()
+        return [(tuple(int(v) for v in face), self.describe(gray, face, now, camera)) for face in faces]
+
+    def describe(self, gray, box, now=None, camera=None):
+        """
+        Return eye/smile attributes for a face box in frame coordinates, reusing the cached
+        sub-cascade result if the face is tracked on this camera
+        """
+        if now is None:
+            now = time.time()
+        box = tuple(int(v) for v in box)
+
+        with self._lock:
+            # Drop stale tracks, then look for one this face continues
+            tracks = [t for t in self._tracks.get(camera, []) if now - t['time'] <= self.cache_ttl]
+            self._tracks[camera] = tracks
+            best = None
+            best_iou = TRACK_IOU_THRESHOLD
+            for track in tracks:
+                iou = box_iou(track['box'], box)
+                if iou >= best_iou:
+                    best, best_iou = track, iou
+
+            if best is not None:
+                # Follow the face but keep the original timestamp so results still expire
+                best['box'] = box
+                return self._to_frame(best['attributes'], box)
+
+        attributes = self._run_sub_cascades(gray, box)
+        with self._lock:
+            self._tracks.setdefault(camera, []).append({'box': box, 'attributes': attributes, 'time': now})
+        return self._to_frame(attributes, box)
+
+    def _run_sub_cascades(self, gray, box):
+        """
+        Run eye cascade on the upper half and smile cascade on the lower third of a face.
+        Sub-boxes are stored as fractions of the face box so cached results follow the face.
+        """
+        x, y, w, h = box
+        attributes = {}
+
+        def relative(boxes, top):
+            return [(bx / w, (top - y + by) / h, bw / w, bh / h) for (bx, by, bw, bh) in boxes]
+
+        if self.eye_cascade is not None:
+            upper = gray[y:y + h // 2, x:x + w]
+            params = {
+                'scaleFactor': 1.1,
+                'minNeighbors': 10,
+                'minSize': (max(w // 8, 10), max(h // 8, 10)),
+                'maxSize': (w // 2, h // 2)
+            }
+            params.update(self.eye_params)
+            eyes = self.eye_cascade.detectMultiScale(upper, **params)
+            attributes['eyes'] = relative(eyes, y)
+
+        if self.smile_cascade is not None:
+            top = y + (2 * h) // 3
+            lower = gray[top:y + h, x:x + w]
+            params = {
+                'scaleFactor': 1.1,
+                'minNeighbors': 15,
+                'minSize': (max(w // 4, 20), max(h // 10, 10))
+            }
+            params.update(self.smile_params)
+            smiles = self.smile_cascade.detectMultiScale(lower, **params)
+            attributes['smile'] = relative(smiles, top)
+            attributes['smiling'] = len(smiles) > 0
+
+        return attributes
+
+    def _to_frame(self, attributes, box):
+        """Map face-relative sub-boxes onto the current face box"""
+        x, y, w, h = box
+        result = dict(attributes)
+        for key in ('eyes', 'smile'):
+            if key in attributes:
+                result[key] = [(int(x + rx * w), int(y + ry * h), int(rw * w), int(rh * h))
+                               for (rx, ry, rw, rh) in attributes[key]]
+        return result
+
+    def reset(self):
+        """Forget all tracked faces"""
+        with self._lock:
+            self._tracks = {}
@@ -0,0 +1,125 @@
+"""
+SafeSight Face Detectors
+Pluggable face detection backends: Haar cascade (default) and OpenCV DNN on CPU
+"""
+
+import cv2
+import os
+import threading
+from abc import ABC, abstractmethod
+from batching import MicroBatcher
+from face_attributes import load_cascade
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "OpenCV-Face-Recognition-master", "FaceDetection", "models")
+
+# OpenCV's ResNet-10 SSD face detector (see opencv/samples/dnn/face_detector)
+DNN_PROTOTXT = os.path.join(MODELS_DIR, "deploy.prototxt")
+DNN_WEIGHTS = os.path.join(MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+
+
+class FaceDetector(ABC):
+    """Base detector: returns (x, y, w, h) face boxes for BGR frames and their grayscale copies"""
+
+    name = 'base'
+
+    def detect(self, frame, gray):
+        return self.detect_batch([frame], [gray])[0]
+
+    @abstractmethod
+    def detect_batch(self, frames, grays):
+        """Return one list of face boxes per frame, in order"""
+
+
+class HaarFaceDetector(FaceDetector):
+    """Haar cascade detector; each frame is processed on its own"""
+
+    name = 'haar'
+
+    def __init__(self, cascade_path, scaleFactor=1.2, minNeighbors=5, min_ratio=0.1):
+        self.cascade = load_cascade(cascade_path)
+        self.scaleFactor = scaleFactor
+        self.minNeighbors = minNeighbors
+        self.min_ratio = min_ratio
+
+    def detect_batch(self, frames, grays):
+        results = []
+        for gray in grays:
+            minW = self.min_ratio * gray.shape[1]
+            minH = self.min_ratio * gray.shape[0]
+            faces = self.cascade.detectMultiScale(
+                gray,
+                scaleFactor=self.scaleFactor,
+                minNeighbors=self.minNeighbors,
+                minSize=(int(minW), int(minH))
+            )
+            results.append([tuple(int(v) for v in face) for face in faces])
+        return results
+
+
+class DnnFaceDetector(FaceDetector):
+    """ResNet-10 SSD face detector on the OpenCV DNN CPU backend, batched across frames"""
+
+    name = 'dnn'
+
+    def __init__(self, prototxt=DNN_PROTOTXT, weights=DNN_WEIGHTS, confidence=0.6, input_size=(300, 300), threads=None):
+        for path in (prototxt, weights):
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"DNN face model not found at {path}")
+        # cv2 thread pool is process-wide; set it explicitly so inference cost is predictable
+        if threads is not None:
+            cv2.setNumThreads(threads)
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, weights)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.confidence = confidence
+        self.input_size = input_size
+        self._lock = threading.Lock()
+
+    def detect_batch(self, frames, grays):
+        if not frames:
+            return []
+        blob = cv2.dnn.blobFromImages(frames, 1.0, self.input_size, (104.0, 177.0, 123.0), swapRB=False, crop=False)
+        with self._lock:
+            self.net.setInput(blob)
+            detections = self.net.forward()
+
+        # Rows are [image_id, label, confidence, x1, y1, x2, y2] with normalized coordinates
+        results = [[] for _ in frames]
+        for image_id, _, confidence, x1, y1, x2, y2 in detections.reshape(-1, 7):
+            index = int(image_id)
+            if confidence < self.confidence or not 0 <= index < len(frames):
+                continue
+            h, w = frames[index].shape[:2]
+            left, top = max(0, int(x1 * w)), max(0, int(y1 * h))
+            right, bottom = min(w, int(x2 * w)), min(h, int(y2 * h))
+            if right > left and bottom > top:
+                results[index].append((left, top, right - left, bottom - top))
+        return results
+
+
+class BatchingDetector(FaceDetector):
+    """Collect concurrent detect() calls (e.g. one per camera) into a single detect_batch()"""
+
+    def __init__(self, detector, max_batch=4, max_wait=0.01):
+        self.detector = detector
+        self.name = detector.name
+        self._batcher = MicroBatcher(self._run, max_batch, max_wait)
+
+    def _run(self, requests):
+        return self.detector.detect_batch([frame for frame, _ in requests], [gray for _, gray in requests])
+
+    def detect(self, frame, gray):
+        faces = self._batcher.submit((frame, gray))
+        return faces if faces is not None else []
+
+    def detect_batch(self, frames, grays):
+        return self.detector.detect_batch(frames, grays)
+
+
+def create_detector(backend, cascade_path, threads=None, max_batch=4):
+    """Build a face detector by backend name ('haar' or 'dnn')"""
+    if backend == 'haar':
+        return HaarFaceDetector(cascade_path)
+    if backend == 'dnn':
+        return BatchingDetector(DnnFaceDetector(threads=threads), max_batch=max_batch)
+    raise ValueError(f"Unknown detector backend: {backend}")
@@ -3,7 +3,7 @@ SafeSight Face Recognition Server
 Flask backend for streaming OpenCV facial recognition to web frontend
 """
 
-from flask import Flask, Response, jsonify
+from flask import Flask, Blueprint, Response, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import cv2
@@ -11,153 +11,303 @@ import numpy as np
 import os
 import json
 import time
+import threading
 from datetime import datetime
+from face_attributes import FaceAttributeDetector
+from components import LazyComponent, CameraSource
+from face_detectors import create_detector
+from recognition import RecognitionService, PresenceTable
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
-socketio = SocketIO(app, cors_allowed_origins="*")
+bp = Blueprint('safesight', __name__)
+socketio = SocketIO()
 
-# Load the trained face recognition model
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-model_path = os.path.join(os.path.dirname(__file__), "OpenCV-Face-Recognition-master", "trainer", "trainer.yml")
+BASE_DIR = os.path.join(os.path.dirname(__file__), "OpenCV-Face-Recognition-master")
+model_path = os.path.join(BASE_DIR, "trainer", "trainer.yml")
+cascade_path = os.path.join(BASE_DIR, "FacialRecognition", "haarcascade_frontalface_default.xml")
+names_path = os.path.join(BASE_DIR, "trainer", "names.json")
 
-# Check if model exists
-if not os.path.isfile(model_path):
-    print(f"[ERROR] Trained model not found at {model_path}")
-    print("[INFO] Please run 02_face_training.py first to train the model")
-    exit()
+# Camera indexes to open (1 = external webcam); the first one backs /video_feed
+CAMERA_INDEXES = [1]
 
-recognizer.read(model_path)
-print(f"[INFO] Loaded trained model from {model_path}")
+# Face detector backend: 'haar' (default) or 'dnn' (OpenCV DNN on CPU, needs models/ files)
+DETECTOR_BACKEND = 'haar'
+DNN_THREADS = 4
 
-# Load Haar Cascade for face detection
-cascade_path = os.path.join(os.path.dirname(__file__), "OpenCV-Face-Recognition-master", "FacialRecognition", "haarcascade_frontalface_default.xml")
-if not os.path.isfile(cascade_path):
-    print(f"[ERROR] Haar Cascade file not found at {cascade_path}")
-    exit()
+# Optional eye/smile enrichment of face_detected events
+ENABLE_FACE_ATTRIBUTES = False
 
-face_cascade = cv2.CascadeClassifier(cascade_path)
-print(f"[INFO] Loaded Haar Cascade from {cascade_path}")
+def load_model():
+    """Load the trained face recognition model"""
+    if not os.path.isfile(model_path):
+        print("[INFO] Please run 02_face_training.py first to train the model")
+        raise FileNotFoundError(f"Trained model not found at {model_path}")
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(model_path)
+    print(f"[INFO] Loaded trained model from {model_path}")
+    return recognizer
 
-# Load names from JSON mapping
-names = ['Unknown']  # Index 0 is Unknown
-names_path = os.path.join(os.path.dirname(__file__), "OpenCV-Face-Recognition-master", "trainer", "names.json")
-if os.path.isfile(names_path):
+def load_detector():
+    """Load the configured face detector backend"""
+    face_detector = create_detector(DETECTOR_BACKEND, cascade_path, threads=DNN_THREADS, max_batch=len(CAMERA_INDEXES))
+    print(f"[INFO] Loaded {face_detector.name} face detector")
+    return face_detector
+
+def load_names():
+    """Load names from JSON mapping; index 0 is Unknown"""
+    if not os.path.isfile(names_path):
+        print("[WARNING] Names mapping not found. Using default names.")
+        return ['Unknown', 'Default User']
     with open(names_path, 'r') as f:
         name_to_id = json.load(f)
-        # Create a list where index corresponds to ID
-        max_id = max(name_to_id.values()) if name_to_id else 0
-        names = ['Unknown'] * (max_id + 1)
-        for name, id_val in name_to_id.items():
-            names[id_val] = name
+    # Create a list where index corresponds to ID
+    max_id = max(name_to_id.values()) if name_to_id else 0
+    names = ['Unknown'] * (max_id + 1)
+    for name, id_val in name_to_id.items():
+        names[id_val] = name
     print(f"[INFO] Loaded names: {names}")
-else:
-    print("[WARNING] Names mapping not found. Using default names.")
-    names = ['Unknown', 'Default User']
-
-# Initialize webcam
-camera = cv2.VideoCapture(1, cv2.CAP_DSHOW)  # Use camera 1 (external webcam)
-if not camera.isOpened():
-    print("[ERROR] Could not open camera")
-    exit()
-
-camera.set(3, 640)  # Set width
-camera.set(4, 480)  # Set height
-print("[INFO] Camera initialized successfully")
-
-# State management
-last_detection = {
-    'name': None,
-    'confidence': 0,
-    'timestamp': None,
-    'type': None  # 'known' or 'unknown'
-}
-
-# Cooldown to prevent spamming events (in seconds)
-EVENT_COOLDOWN = 3
-last_event_time = 0
-
-def generate_frames():
-    """Generate video frames with face recognition"""
-    global last_detection, last_event_time
+    return names
+
+def load_recognition():
+    """Build the recognition service once the model and names are loaded"""
+    recognizer, label_names = model.wait(), names.wait()
+    if recognizer is None:
+        raise RuntimeError("Face recognition model is not available")
+    return RecognitionService(recognizer, label_names)
+
+def load_attributes():
+    """Build the eye/smile detector"""
+    return FaceAttributeDetector()
+
+# Components load in background threads started by create_app()
+model = LazyComponent('model', load_model)
+detector = LazyComponent('detector', load_detector)
+names = LazyComponent('names', load_names)
+recognition = LazyComponent('recognition', load_recognition)
+attributes = LazyComponent('attributes', load_attributes) if ENABLE_FACE_ATTRIBUTES else None
+cameras = [CameraSource(index) for index in CAMERA_INDEXES]
+
+def loaded_components():
+    """All non-camera components, in load order"""
+    return [model, detector, names, recognition] + ([attributes] if attributes is not None else [])
+
+# Sightings of the same identity on any camera within this many seconds form one presence
+PRESENCE_WINDOW = 10
+presences = PresenceTable(PRESENCE_WINDOW)
+
+# Latest processed frame per camera: index -> (seq, detections). Every viewer of a camera
+# shares one detection pass and one presence sighting per captured frame.
+processed = {}
+processed_locks = {}
+
+# Binary frame channel: sid -> {'credits': frames the client may still receive, 'window': subscribed credits}
+FRAME_CREDITS_DEFAULT = 2
+FRAME_CREDITS_MAX = 8
+frame_clients = {}
+frame_clients_lock = threading.Lock()
+frame_task_running = False
+frame_seq = 0
+
+def read_frame(camera, last_seq=0):
+    """Wait for the next mirrored frame from a camera; return (seq, frame) or (last_seq, None)"""
+    seq, frame = camera.read(last_seq)
+    if frame is None:
+        return last_seq, None
+    # Flip horizontally for mirror effect
+    return seq, cv2.flip(frame, 1)
+
+def process_frame(camera, seq, frame):
+    """Recognize a captured frame once, however many streams are showing this camera"""
+    with processed_locks.setdefault(camera.index, threading.Lock()):
+        cached = processed.get(camera.index)
+        # A stream that lags behind reuses the newest result instead of recording the sighting again
+        if cached is not None and seq <= cached[0]:
+            return cached[1]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        detections = recognize_faces(frame, gray, time.time(), camera.index)
+        processed[camera.index] = (seq, detections)
+    return detections
+
+def recognize_faces(frame, gray, current_time, camera_index):
+    """Detect and identify faces in a frame, emitting face_detected events for new presences"""
+    # Degrade gracefully: stream plain frames until detector and recognition are loaded
+    if not (detector.ready and recognition.ready):
+        return []
+    attribute_detector = attributes.value if attributes is not None and attributes.ready else None
     
-    font = cv2.FONT_HERSHEY_SIMPLEX
-    minW = 0.1 * camera.get(3)
-    minH = 0.1 * camera.get(4)
+    # Detect faces, then identify all of this frame's crops in one call
+    faces = detector.value.detect(frame, gray)
+    results = recognition.value.recognize_batch([gray[y:y + h, x:x + w] for (x, y, w, h) in faces])
     
-    while True:
-        success, frame = camera.read()
-        if not success:
-            break
-        
-        # Flip horizontally for mirror effect
-        frame = cv2.flip(frame, 1)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    detections = []
+    for (x, y, w, h), result in zip(faces, results):
+        name, detection_type = result['name'], result['type']
+        confidence_text = f"{result['confidence']}%"
         
-        # Detect faces
-        faces = face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.2,
-            minNeighbors=5,
-            minSize=(int(minW), int(minH))
-        )
+        detection = {
+            'box': [int(x), int(y), int(w), int(h)],
+            'name': name,
+            'confidence': result['confidence'],
+            'confidence_text': confidence_text,
+            'type': detection_type
+        }
         
-        current_time = time.time()
+        # Eye/smile attributes for every face; sub-cascades rerun at most once per cache TTL per tracked face
+        if attribute_detector is not None:
+            face_attributes = attribute_detector.describe(gray, (x, y, w, h), current_time, camera_index)
+            detection['attributes'] = {
+                'eyes': len(face_attributes.get('eyes', [])),
+                'smiling': face_attributes.get('smiling', False)
+            }
+        detections.append(detection)
         
-        for (x, y, w, h) in faces:
-            # Draw rectangle around face
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            
-            # Predict the ID of the detected face
-            id, confidence = recognizer.predict(gray[y:y + h, x:x + w])
-            
-            # Determine name and confidence
-            # Lower confidence = better match. Use stricter threshold for multiple people (< 55)
-            if confidence < 55:
-                name = names[id] if id < len(names) else "Unknown"
-                confidence_text = f"{round(100 - confidence)}%"
-                detection_type = 'known'
-            else:
-                name = "Unknown"
-                confidence_text = f"{round(100 - confidence)}%"
-                detection_type = 'unknown'
-            
-            # Display name and confidence on frame
-            cv2.putText(frame, str(name), (x + 5, y - 5), font, 1, (255, 255, 255), 2)
-            cv2.putText(frame, str(confidence_text), (x + 5, y + h - 5), font, 1, (255, 255, 0), 1)
+        # Only a new presence or a new camera on an existing one reaches the frontend
+        presence, change = presences.observe(camera_index, result, current_time, (x, y, w, h))
+        if change == 'new':
+            event_data = {
+                'name': name,
+                'confidence': result['confidence'],
+                'timestamp': datetime.now().isoformat(),
+                'type': detection_type,
+                'presence_id': presence['presence_id'],
+                'camera': camera_index,
+                'cameras': presence['cameras']
+            }
+            if 'attributes' in detection:
+                event_data['attributes'] = detection['attributes']
             
-            # Emit WebSocket event if detection changed or cooldown passed
-            if (current_time - last_event_time > EVENT_COOLDOWN):
-                if name != last_detection['name'] or detection_type != last_detection['type']:
-                    event_data = {
-                        'name': name,
-                        'confidence': round(100 - confidence) if confidence < 100 else 0,
-                        'timestamp': datetime.now().isoformat(),
-                        'type': detection_type
-                    }
-                    
-                    # Emit event to all connected clients
-                    socketio.emit('face_detected', event_data)
-                    
-                    # Update last detection
-                    last_detection = event_data
-                    last_event_time = current_time
-                    
-                    print(f"[EVENT] {detection_type.upper()}: {name} ({confidence_text})")
+            # Emit event to all connected clients
+            socketio.emit('face_detected', event_data)
+            print(f"[EVENT] {detection_type.upper()}: {name} ({confidence_text}) on camera {camera_index}")
+        elif change == 'camera':
+            socketio.emit('presence_updated', {
+                'presence_id': presence['presence_id'],
+                'name': name,
+                'type': detection_type,
+                'timestamp': datetime.now().isoformat(),
+                'camera': camera_index,
+                'cameras': presence['cameras']
+            })
+            print(f"[EVENT] {name} moved to camera {camera_index} (trail: {presence['cameras']})")
+    
+    return detections
+
+def placeholder_frame(camera):
+    """JPEG shown while a camera is warming up or being re-acquired"""
+    frame = np.zeros((camera.height, camera.width, 3), dtype=np.uint8)
+    text = f"Camera {camera.index} unavailable ({camera.state})"
+    cv2.putText(frame, text, (20, camera.height // 2), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    ret, buffer = cv2.imencode('.jpg', frame)
+    return buffer.tobytes()
+
+def generate_frames(camera):
+    """Generate video frames with face recognition"""
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    seq = 0
+    
+    while True:
+        seq, frame = read_frame(camera, seq)
+        if frame is None:
+            # Keep writing while the camera is down so viewers see why and disconnects are noticed
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + placeholder_frame(camera) + b'\r\n')
+            continue
+        
+        # A recognition failure must not end the stream; fall back to the unannotated frame
+        try:
+            detections = process_frame(camera, seq, frame)
+            annotated = frame.copy()
+            for detection in detections:
+                x, y, w, h = detection['box']
+                # Draw rectangle around face
+                cv2.rectangle(annotated, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                
+                # Display name and confidence on frame
+                cv2.putText(annotated, str(detection['name']), (x + 5, y - 5), font, 1, (255, 255, 255), 2)
+                cv2.putText(annotated, str(detection['confidence_text']), (x + 5, y + h - 5), font, 1, (255, 255, 0), 1)
+        except Exception as e:
+            print(f"[ERROR] Video feed camera {camera.index}: {e}")
+            annotated = frame
         
         # Encode frame as JPEG
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
+        ret, buffer = cv2.imencode('.jpg', annotated)
+        frame_bytes = buffer.tobytes() if ret else placeholder_frame(camera)
         
         # Yield frame in byte format for MJPEG streaming
         yield (b'--frame\r\n'
                b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
-@app.route('/video_feed')
-def video_feed():
+def broadcast_frames():
+    """Push raw frames plus detection metadata to subscribed Socket.IO clients"""
+    global frame_task_running
+    
+    camera = cameras[0]
+    camera_seq = 0
+    while True:
+        with frame_clients_lock:
+            if not frame_clients:
+                frame_task_running = False
+                return
+            ready = [sid for sid, client in frame_clients.items() if client['credits'] > 0]
+        
+        # Every subscriber is out of credits: wait for acks instead of capturing
+        if not ready:
+            socketio.sleep(0.01)
+            continue
+        
+        # A bad frame must not end the task and strand every subscriber
+        try:
+            camera_seq = send_frame(camera, camera_seq, ready)
+        except Exception as e:
+            print(f"[ERROR] Frame channel: {e}")
+            socketio.sleep(0.1)
+            continue
+        
+        socketio.sleep(0)
+
+def send_frame(camera, camera_seq, ready):
+    """Capture, recognize and send one frame to the ready subscribers; return the camera seq"""
+    global frame_seq
+    
+    camera_seq, frame = read_frame(camera, camera_seq)
+    if frame is None:
+        return camera_seq
+    
+    detections = process_frame(camera, camera_seq, frame)
+    
+    # No overlays: clients draw boxes and labels from the metadata
+    ret, buffer = cv2.imencode('.jpg', frame)
+    if not ret:
+        return camera_seq
+    
+    frame_seq += 1
+    payload = {
+        'seq': frame_seq,
+        'camera': camera.index,
+        'timestamp': datetime.now().isoformat(),
+        'width': frame.shape[1],
+        'height': frame.shape[0],
+        'faces': [{k: v for k, v in d.items() if k != 'confidence_text'} for d in detections],
+        'image': buffer.tobytes()
+    }
+    
+    # Spend one credit per client; clients without credit silently miss this frame
+    with frame_clients_lock:
+        targets = [sid for sid in ready if sid in frame_clients and frame_clients[sid]['credits'] > 0]
+        for sid in targets:
+            frame_clients[sid]['credits'] -= 1
+    for sid in targets:
+        socketio.emit('frame', payload, to=sid)
+    
+    return camera_seq
+
+@bp.route('/video_feed')
+@bp.route('/video_feed/<int:camera_id>')
+def video_feed(camera_id=0):
     """Video streaming route"""
+    if camera_id >= len(cameras):
+        return jsonify({'error': f'Unknown camera {camera_id}'}), 404
     return Response(
-        generate_frames(),
+        generate_frames(cameras[camera_id]),
         mimetype='multipart/x-mixed-replace; boundary=frame',
         headers={
             'Cache-Control': 'no-cache, no-store, must-revalidate',
@@ -167,16 +317,55 @@ def video_feed():
         }
     )
 
-@app.route('/api/status')
+@bp.route('/api/status')
 def status():
-    """Get server status"""
+    """Get server status with per-component readiness"""
+    loaded = loaded_components()
+    all_ready = all(c.ready for c in loaded) and all(c.ready for c in cameras)
     return jsonify({
-        'status': 'online',
-        'camera': camera.isOpened(),
-        'model_loaded': True,
-        'names_count': len(names) - 1  # Exclude 'Unknown'
+        'status': 'online' if all_ready else 'degraded',
+        'camera': bool(cameras) and cameras[0].ready,
+        'model_loaded': model.ready,
+        'names_count': len(names.value) - 1 if names.ready else 0,  # Exclude 'Unknown'
+        'components': {
+            **{c.name: c.describe() for c in loaded},
+            'cameras': [c.describe() for c in cameras]
+        }
     })
 
+@bp.route('/api/presence')
+def presence():
+    """People currently present, each with the cameras they were seen on"""
+    now = time.time()
+    return jsonify([
+        {
+            'presence_id': p['presence_id'],
+            'name': p['name'],
+            'type': p['type'],
+            'confidence': p['confidence'],
+            'first_seen': datetime.fromtimestamp(p['first_seen']).isoformat(),
+            'last_seen': datetime.fromtimestamp(p['last_seen']).isoformat(),
+            'cameras': p['cameras'],
+            'sightings': p['sightings']
+        }
+        for p in presences.active(now)
+    ])
+
+def create_app():
+    """Create the Flask app and start loading components in the background"""
+    app = Flask(__name__)
+    CORS(app)  # Enable CORS for React frontend
+    app.register_blueprint(bp)
+    socketio.init_app(app, cors_allowed_origins="*")
+    
+    # Model, detector and cameras load concurrently; routes serve immediately
+    for component in loaded_components():
+        component.start()
+    for camera in cameras:
+        camera.start()
+    
+    return app
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
@@ -186,8 +375,41 @@ def handle_connect():
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    with frame_clients_lock:
+        frame_clients.pop(request.sid, None)
     print('[WEBSOCKET] Client disconnected')
 
+@socketio.on('subscribe_frames')
+def handle_subscribe_frames(data=None):
+    """Opt in to binary 'frame' events with an initial credit window"""
+    global frame_task_running
+    
+    credits = FRAME_CREDITS_DEFAULT
+    if isinstance(data, dict) and isinstance(data.get('credits'), int):
+        credits = max(1, min(data['credits'], FRAME_CREDITS_MAX))
+    
+    with frame_clients_lock:
+        frame_clients[request.sid] = {'credits': credits, 'window': credits}
+        start_task = not frame_task_running
+        frame_task_running = True
+    if start_task:
+        socketio.start_background_task(broadcast_frames)
+    print(f'[WEBSOCKET] Client subscribed to frames ({credits} credits)')
+
+@socketio.on('frame_ack')
+def handle_frame_ack(data=None):
+    """Return one credit after the client has rendered a frame, never exceeding its subscribed window"""
+    with frame_clients_lock:
+        client = frame_clients.get(request.sid)
+        if client is not None:
+            client['credits'] = min(client['credits'] + 1, client['window'])
+
+@socketio.on('unsubscribe_frames')
+def handle_unsubscribe_frames():
+    """Stop sending binary 'frame' events to this client"""
+    with frame_clients_lock:
+        frame_clients.pop(request.sid, None)
+
 if __name__ == '__main__':
     print("\n" + "="*50)
     print("SafeSight Face Recognition Server")
@@ -197,6 +419,8 @@ if __name__ == '__main__':
     print(f"WebSocket: ws://localhost:5000")
     print("="*50 + "\n")
     
+    app = create_app()
+    
     # Run the Flask app with SocketIO
     # use_reloader=False prevents camera conflicts on restart
     socketio.run(app, host='0.0.0.0', port=5000, debug=True, use_reloader=False)
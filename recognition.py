@@ -0,0 +1,120 @@
+"""
+SafeSight Recognition Service
+Face identification and cross-camera presence tracking
+"""
+
+import itertools
+import threading
+from face_attributes import box_iou
+
+# Lower LBPH confidence = better match. Use stricter threshold for multiple people (< 55)
+CONFIDENCE_THRESHOLD = 55
+
+# An unknown face continues an existing unknown presence on the same camera when boxes overlap this much
+UNKNOWN_TRACK_IOU = 0.3
+
+
+class RecognitionService:
+    """Identify grayscale face crops against the trained LBPH model"""
+
+    def __init__(self, recognizer, names, threshold=CONFIDENCE_THRESHOLD):
+        self.recognizer = recognizer
+        self.names = names
+        self.threshold = threshold
+
+    def recognize_batch(self, crops):
+        """Return one {'id', 'name', 'confidence', 'type'} result per crop, in order"""
+        results = []
+        for crop in crops:
+            id, confidence = self.recognizer.predict(crop)
+            if confidence < self.threshold:
+                name = self.names[id] if id < len(self.names) else "Unknown"
+                detection_type = 'known'
+            else:
+                name = "Unknown"
+                detection_type = 'unknown'
+            results.append({
+                'id': id,
+                'name': name,
+                'confidence': round(100 - confidence) if confidence < 100 else 0,
+                'type': detection_type
+            })
+        return results
+
+
+class PresenceTable:
+    """
+    Merge sightings of the same identity across cameras within a short time window.
+    Known people are keyed by label id; unknown faces are never merged across cameras
+    and are followed per camera by box overlap, so each stranger is its own presence.
+    """
+
+    def __init__(self, window=10.0):
+        self.window = window
+        self._records = {}  # key -> presence record
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def observe(self, camera, result, now, box):
+        """
+        Record one sighting and return (record, change) where change is
+        'new' (first sighting in the window), 'camera' (seen on a new camera) or None
+        """
+        with self._lock:
+            self._expire(now)
+            key = self._match(camera, result, box)
+            record = self._records.get(key) if key is not None else None
+            if record is None:
+                presence_id = next(self._ids)
+                if key is None:
+                    key = ('unknown', camera, presence_id)
+                record = {
+                    'presence_id': presence_id,
+                    'name': result['name'],
+                    'type': result['type'],
+                    'confidence': result['confidence'],
+                    'first_seen': now,
+                    'last_seen': now,
+                    'cameras': [camera],
+                    'sightings': 1,
+                    'box': tuple(box)
+                }
+                self._records[key] = record
+                return self._snapshot(record), 'new'
+
+            record['last_seen'] = now
+            record['sightings'] += 1
+            record['confidence'] = max(record['confidence'], result['confidence'])
+            record['box'] = tuple(box)
+            change = None
+            if camera not in record['cameras']:
+                record['cameras'].append(camera)
+                change = 'camera'
+            return self._snapshot(record), change
+
+    def _match(self, camera, result, box):
+        """Key of the presence this sighting continues, or None for a new unknown face"""
+        if result['type'] == 'known':
+            return ('known', result['id'])
+        best, best_iou = None, UNKNOWN_TRACK_IOU
+        for key, record in self._records.items():
+            if key[0] == 'unknown' and key[1] == camera:
+                iou = box_iou(record['box'], box)
+                if iou >= best_iou:
+                    best, best_iou = key, iou
+        return best
+
+    def active(self, now):
+        """Snapshot of presences seen within the window"""
+        with self._lock:
+            self._expire(now)
+            return [self._snapshot(r) for r in self._records.values()]
+
+    def _snapshot(self, record):
+        snapshot = dict(record, cameras=list(record['cameras']))
+        del snapshot['box']
+        return snapshot
+
+    def _expire(self, now):
+        for key in [k for k, r in self._records.items() if now - r['last_seen'] > self.window]:
+            del self._records[key]
@@ -4,6 +4,32 @@ import { useData } from '../context/DataContext';
 import { useNavigate } from 'react-router-dom';
 import { LogOut, Volume2, VolumeX, AlertTriangle, ShieldCheck, Smartphone, Mail } from 'lucide-react';
 import { io, Socket } from 'socket.io-client';
+import type { FramePayload } from '../types';
+
+// Opt-in binary Socket.IO frame channel instead of the MJPEG /video_feed stream
+const USE_FRAME_CHANNEL = import.meta.env.VITE_FRAME_CHANNEL === 'true';
+const FRAME_CREDITS = 2;
+
+// Draw a frame and its detection boxes/labels client-side
+const drawFrame = (canvas: HTMLCanvasElement, bitmap: ImageBitmap, data: FramePayload) => {
+    canvas.width = data.width;
+    canvas.height = data.height;
+    const ctx = canvas.getContext('2d');
+    if (!ctx) return;
+
+    ctx.drawImage(bitmap, 0, 0);
+    ctx.lineWidth = 2;
+    ctx.font = '24px sans-serif';
+    for (const face of data.faces) {
+        const [x, y, w, h] = face.box;
+        ctx.strokeStyle = '#00ff00';
+        ctx.strokeRect(x, y, w, h);
+        ctx.fillStyle = '#ffffff';
+        ctx.fillText(face.name, x + 5, y - 5);
+        ctx.fillStyle = '#00ffff';
+        ctx.fillText(`${face.confidence}%`, x + 5, y + h - 5);
+    }
+};
 
 const Monitor: React.FC = () => {
     const { currentUser, logout } = useAuth();
@@ -18,6 +44,7 @@ const Monitor: React.FC = () => {
 
     const videoRef = useRef<HTMLDivElement>(null);
     const socketRef = useRef<Socket | null>(null);
+    const canvasRef = useRef<HTMLCanvasElement>(null);
 
     const handleLogout = () => {
         logout();
@@ -37,9 +64,37 @@ const Monitor: React.FC = () => {
         const socket = io('http://localhost:5000');
         socketRef.current = socket;
 
+        // Highest frame seq drawn in the current subscription; bumped on every (re)connect
+        let subscription = 0;
+        let lastDrawnSeq = 0;
+
         socket.on('connect', () => {
             console.log('[WebSocket] Connected to face recognition server');
             setConnectionStatus('connected');
+
+            if (USE_FRAME_CHANNEL) {
+                // A restarted server numbers frames from 1 again
+                subscription += 1;
+                lastDrawnSeq = 0;
+                socket.emit('subscribe_frames', { credits: FRAME_CREDITS });
+            }
+        });
+
+        // Each rendered frame returns one credit; the server drops frames while we have none
+        socket.on('frame', (data: FramePayload) => {
+            const frameSubscription = subscription;
+            createImageBitmap(new Blob([data.image], { type: 'image/jpeg' }))
+                .then(bitmap => {
+                    // Decodes can finish out of order; never draw an older frame over a newer one,
+                    // nor a frame from before a reconnect
+                    if (canvasRef.current && frameSubscription === subscription && data.seq > lastDrawnSeq) {
+                        lastDrawnSeq = data.seq;
+                        drawFrame(canvasRef.current, bitmap, data);
+                    }
+                    bitmap.close();
+                })
+                .catch(err => console.error('[Frame] Decode failed', err))
+                .finally(() => socket.emit('frame_ack', { seq: data.seq }));
         });
 
         socket.on('disconnect', () => {
@@ -133,7 +188,12 @@ const Monitor: React.FC = () => {
                             }`}
                     >
                         {/* Live Video Stream */}
-                        {connectionStatus === 'connected' ? (
+                        {connectionStatus === 'connected' && USE_FRAME_CHANNEL ? (
+                            <canvas
+                                ref={canvasRef}
+                                className="w-full h-full object-cover"
+                            />
+                        ) : connectionStatus === 'connected' ? (
                             <img
                                 src="http://localhost:5000/video_feed"
                                 alt="Live Camera Feed"
@@ -27,3 +27,21 @@ export interface Alert {
     timestamp: number;
     imageUrl?: string; // Snapshot of the unknown person
 }
+
+export interface FrameDetection {
+    box: [number, number, number, number]; // x, y, width, height in frame pixels
+    name: string;
+    confidence: number;
+    type: 'known' | 'unknown';
+    attributes?: { eyes: number; smiling: boolean }; // Only when the server enables face attributes
+}
+
+export interface FramePayload {
+    seq: number;
+    camera: number; // Camera index the frame came from
+    timestamp: string;
+    width: number;
+    height: number;
+    faces: FrameDetection[];
+    image: ArrayBuffer; // Encoded JPEG, without overlays
+}